@@ -0,0 +1,361 @@
+"""Benchmarks for the Aiden engine hot paths, run outside Streamlit.
+
+    python benchmarks/bench_engine.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_engine.py --compare benchmarks/baseline.json --threshold 0.2
+
+Exits with status 1 when any case regresses past the threshold.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import (
+    generate_summary,
+    simulate_rl_structures,
+    top_candidate,
+    what_if_analysis,
+    simulated_chat_response,
+    plot_structure_landscape,
+    plot_attachment_impact,
+    plot_risk_return,
+)
+
+# =====================
+# 1. FIXED SCALES
+# =====================
+STRUCTURE_SCALES = [10, 1_000, 100_000]
+EVALUATION_SCALES = [10_000, 1_000_000]
+# Step 5 labels every structure, so its figure stops short of 100k rows.
+RISK_RETURN_SCALES = [10, 1_000]
+
+CHAT_PROMPTS = [
+    "What if we split the 50M limit into two 25M layers?",
+    "How does raising the attachment to 75M affect ROI?",
+    "Suggest a structure with ROI > 15% and low tail risk.",
+]
+
+DEFAULT_SEED = 2025
+DEFAULT_REPEAT = 10
+DEFAULT_MIN_TIME = 5.0
+MAX_REPEAT = 1000
+DEFAULT_THRESHOLD = 0.20
+DEFAULT_RETRIES = 2
+# Differences below these are timer / allocator noise, whatever the ratio.
+DEFAULT_NOISE_FLOOR = 5e-6
+MEMORY_NOISE_FLOOR = 64 * 1024
+CALIBRATION_REPEAT = 20
+
+PERCENTILES = [10, 50, 90, 99]
+
+
+def seed_everything(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+# =====================
+# 2. BENCHMARK CASES
+# =====================
+# Each setup runs untimed and returns the callable that gets measured.
+
+def setup_simulate(n):
+    return lambda: simulate_rl_structures(50, n=n)
+
+def setup_what_if(n):
+    attach_points = [10 + 5 * (i % 19) for i in range(n)]
+    return lambda: [what_if_analysis(a) for a in attach_points]
+
+def setup_top_candidate(n):
+    df = simulate_rl_structures(50, n=n)
+    return lambda: top_candidate(df)
+
+def setup_chat(n):
+    summary = generate_summary()
+    prompts = [CHAT_PROMPTS[i % len(CHAT_PROMPTS)] for i in range(n)]
+    return lambda: [simulated_chat_response(p, summary) for p in prompts]
+
+def render(fig):
+    fig.canvas.draw()
+    plt.close(fig)
+
+def setup_render_landscape(n):
+    df = simulate_rl_structures(50, n=n)
+    best = top_candidate(df)
+    return lambda: render(plot_structure_landscape(df, best))
+
+def setup_render_attachment_impact(n):
+    df = simulate_rl_structures(75, n=n)
+    best = top_candidate(df)
+    return lambda: render(plot_attachment_impact(df, best, 75))
+
+def setup_render_risk_return(n):
+    df = simulate_rl_structures(50, n=n)
+    best = top_candidate(df)
+    return lambda: render(plot_risk_return(df, best))
+
+CASES = [
+    ("simulate_rl_structures", "structures", STRUCTURE_SCALES, setup_simulate),
+    ("what_if_analysis", "evaluations", EVALUATION_SCALES, setup_what_if),
+    ("top_candidate", "structures", STRUCTURE_SCALES, setup_top_candidate),
+    ("simulated_chat_response", "responses", STRUCTURE_SCALES, setup_chat),
+    ("plot_structure_landscape", "structures", STRUCTURE_SCALES, setup_render_landscape),
+    ("plot_attachment_impact", "structures", STRUCTURE_SCALES, setup_render_attachment_impact),
+    ("plot_risk_return", "structures", RISK_RETURN_SCALES, setup_render_risk_return),
+]
+
+
+# =====================
+# 3. MEASUREMENT
+# =====================
+def min_samples(percentile):
+    # A pXX needs at least one sample beyond it to mean anything (p99 -> 100 runs).
+    return -(-100 // (100 - percentile))
+
+def latency_summary(timings):
+    summary = {"samples": len(timings), "min": min(timings), "max": max(timings)}
+    for percentile in PERCENTILES:
+        enough = len(timings) >= min_samples(percentile)
+        summary[f"p{percentile}"] = float(np.percentile(timings, percentile)) if enough else None
+    return summary
+
+def gate_latency(latency):
+    # p10 rather than min: still the fast end of the distribution, but one
+    # unusually quick sample can no longer set the bar for every later run.
+    return latency["p10"] if latency["p10"] is not None else latency["min"]
+
+def calibrate():
+    # Fixed pure-Python workload timed next to every case. Shared and
+    # throttled CPUs drift by tens of percent between runs; dividing by
+    # this cancels most of that drift out of the comparison.
+    best = float("inf")
+    for _ in range(CALIBRATION_REPEAT):
+        start = time.perf_counter()
+        sum(i * i for i in range(100_000))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def measure(setup, scale, seed, min_repeat, min_time):
+    seed_everything(seed)
+    fn = setup(scale)
+    start = time.perf_counter()
+    fn()  # warm-up, also sizes the repeat count
+    warmup = time.perf_counter() - start
+    repeat = min(MAX_REPEAT, max(min_repeat, int(min_time / max(warmup, 1e-9))))
+
+    calibration = calibrate()
+
+    # As in timeit: a collection landing in one run but not another is noise.
+    timings = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            seed_everything(seed)
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    calibration = min(calibration, calibrate())
+
+    # Peak memory gets its own run: tracemalloc slows allocation-heavy code.
+    seed_everything(seed)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latency = latency_summary(timings)
+    return {
+        "latency_s": latency,
+        "calibration_s": calibration,
+        "relative_p10": gate_latency(latency) / calibration,
+        "throughput_per_s": scale / latency["min"] if latency["min"] > 0 else None,
+        "peak_mem_bytes": peak,
+    }
+
+def selected(name, only):
+    return not only or any(pattern in name for pattern in only)
+
+def remeasure(current, keys, seed, min_repeat, min_time):
+    # Keep the faster of the two runs.
+    setups = {name: setup for name, _, _, setup in CASES}
+    for key in keys:
+        result = current["results"][key]
+        print(f"re-running {key} ...", file=sys.stderr, flush=True)
+        retry = measure(setups[result["case"]], result["scale"], seed, min_repeat, min_time)
+        if retry["relative_p10"] < result["relative_p10"]:
+            result.update(retry)
+
+def run_benchmarks(seed, min_repeat, min_time, only=None):
+    results = {}
+    scales = {}
+    for name, unit, case_scales, setup in CASES:
+        if not selected(name, only):
+            continue
+        scales[name] = case_scales
+        for scale in case_scales:
+            key = f"{name}[n={scale}]"
+            print(f"running {key} ...", file=sys.stderr, flush=True)
+            result = measure(setup, scale, seed, min_repeat, min_time)
+            results[key] = {"case": name, "scale": scale, "unit": unit, **result}
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "matplotlib": matplotlib.__version__,
+            "seed": seed,
+            "min_repeat": min_repeat,
+            "min_time": min_time,
+            "scales": scales,
+        },
+        "results": results,
+    }
+
+
+# =====================
+# 4. REPORTING
+# =====================
+ENVIRONMENT_KEYS = ["python", "platform", "numpy", "pandas", "matplotlib"]
+SETTINGS_KEYS = ["min_repeat", "min_time"]
+
+def check_baseline(current, baseline, only=None):
+    """Return warnings about anything that makes the two runs not like-for-like."""
+    warnings = []
+    old_meta, new_meta = baseline.get("meta", {}), current["meta"]
+    for key in ENVIRONMENT_KEYS + SETTINGS_KEYS:
+        if old_meta.get(key) != new_meta.get(key):
+            warnings.append(f"{key} differs: baseline {old_meta.get(key)!r}, current {new_meta.get(key)!r}")
+    for name, scales in new_meta["scales"].items():
+        old_scales = old_meta.get("scales", {}).get(name)
+        if old_scales is not None and old_scales != scales:
+            warnings.append(f"{name} scales differ: baseline {old_scales}, current {scales}")
+
+    for key in current["results"]:
+        if key not in baseline["results"]:
+            warnings.append(f"{key} has no baseline entry")
+    for key, result in baseline["results"].items():
+        if selected(result["case"], only) and key not in current["results"]:
+            warnings.append(f"{key} is in the baseline but was not run")
+    return warnings
+
+def compare(current, baseline, threshold, noise_floor):
+    # Fast-end (p10) latency, normalised by the calibration run: the least
+    # noisy estimate of what the code costs. The noise floor applies to raw
+    # seconds and only screens out timer jitter on microsecond cases.
+    regressions = []
+    for key, result in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            continue
+        old_raw, new_raw = gate_latency(base["latency_s"]), gate_latency(result["latency_s"])
+        old_rel, new_rel = base["relative_p10"], result["relative_p10"]
+        if new_rel > old_rel * (1 + threshold) and new_raw - old_raw > noise_floor:
+            regressions.append((key, "p10 latency (calibrated)", old_rel, new_rel, new_rel / old_rel - 1))
+        old_mem, new_mem = base["peak_mem_bytes"], result["peak_mem_bytes"]
+        if old_mem and new_mem > old_mem * (1 + threshold) and new_mem - old_mem > MEMORY_NOISE_FLOOR:
+            regressions.append((key, "peak memory", old_mem, new_mem, new_mem / old_mem - 1))
+    return regressions
+
+def format_ms(seconds):
+    return f"{seconds * 1e3:.3f}" if seconds is not None else "-"
+
+def print_results(current, baseline=None):
+    header = f"{'case':<40} {'n':>5} {'min (ms)':>10}"
+    header += "".join(f" {f'p{p} (ms)':>10}" for p in PERCENTILES)
+    header += f" {'items/s':>14} {'peak MB':>9}"
+    if baseline:
+        header += f" {'Δ cal. p10':>11}"
+    print(header)
+    for key, result in current["results"].items():
+        latency = result["latency_s"]
+        line = f"{key:<40} {latency['samples']:>5} {format_ms(latency['min']):>10}"
+        line += "".join(f" {format_ms(latency[f'p{p}']):>10}" for p in PERCENTILES)
+        line += f" {result['throughput_per_s'] or 0:>14,.0f} {result['peak_mem_bytes'] / 2**20:>9.2f}"
+        base = baseline["results"].get(key) if baseline else None
+        if base:
+            line += f" {result['relative_p10'] / base['relative_p10'] - 1:>+11.1%}"
+        print(line)
+    print("\npercentiles are left blank (-) when n is too small to estimate them; "
+          f"p{PERCENTILES[-1]} needs n >= {min_samples(PERCENTILES[-1])}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Aiden engine hot paths.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="minimum timed runs per case and scale")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME,
+                        help=f"keep repeating fast cases until about this many seconds are timed (max {MAX_REPEAT} runs)")
+    parser.add_argument("--case", action="append", help="only run cases whose name contains this (repeatable)")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown / memory growth before flagging, e.g. 0.2 = 20%%")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="re-run flagged cases this many times before reporting a regression")
+    parser.add_argument("--noise-floor", type=float, default=DEFAULT_NOISE_FLOOR,
+                        help="ignore latency increases smaller than this many seconds")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        baseline_seed = baseline.get("meta", {}).get("seed")
+        if baseline_seed != args.seed:
+            print(f"refusing to compare: baseline was recorded with --seed {baseline_seed}, "
+                  f"this run uses --seed {args.seed}", file=sys.stderr)
+            return 2
+
+    current = run_benchmarks(args.seed, args.repeat, args.min_time, args.case)
+    if baseline:
+        for _ in range(args.retries):
+            flagged = {key for key, *_ in compare(current, baseline, args.threshold, args.noise_floor)}
+            if not flagged:
+                break
+            remeasure(current, sorted(flagged), args.seed, args.repeat, args.min_time)
+    print_results(current, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nbaseline written to {args.save_baseline}")
+
+    if baseline:
+        warnings = check_baseline(current, baseline, args.case)
+        if warnings:
+            print(f"\n{len(warnings)} warning(s) - results may not be comparable:")
+            for warning in warnings:
+                print(f"  {warning}")
+        regressions = compare(current, baseline, args.threshold, args.noise_floor)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for key, metric, old, new, change in regressions:
+                print(f"  {key} {metric}: {old:.6g} -> {new:.6g} ({change:+.1%})")
+            return 1
+        print(f"\nno regressions beyond {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import pandas as pd
+import numpy as np
+import random
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# =====================
+# SIMULATION ENGINE
+# =====================
+# Plain functions behind the Streamlit pages. Nothing here touches
+# st.session_state, so they can be called directly (e.g. by benchmarks/).
+
+LONG_TREATY = """
+Cedent: Example Insurance Co.
+Program: 2025 U.S. Catastrophe Excess of Loss Treaty (Property Cat XoL)
+...
+(Full treaty text)
+"""
+
+STRUCTURE_COLUMNS = ["Structure", "Expected Loss (M)", "Projected ROI (%)"]
+
+DEFAULT_SUMMARY_CONTEXT = "a mid-layer catastrophe treaty with 50M attachment."
+
+
+def generate_summary():
+    return """
+**Summary of Uploaded Treaty (2025 Cat XoL Program)**
+
+This treaty provides **property catastrophe excess-of-loss coverage** for **Example Insurance Co.**  
+in the **continental U.S., Hawaii, and Puerto Rico** for **January 1 – December 31, 2025**.
+
+- **Program Structure:** 5 × 50 M layers excess 50 M → **300 M limit**, 50 M attachment  
+- **Reinstatements:** 1 × 100% paid, subsequent at 125%  
+- **Covered Perils:** Hurricanes, typhoons, floods (168‑hour clause)  
+- **Exclusions:** War, terrorism, nuclear  
+- **Special Conditions:** 14‑day loss reporting, 30‑day interim updates, ARIAS‑U.S. arbitration  
+
+**Historical Losses:** 70M, 38M, 45M, 92M (Hurricanes & Hail)  
+
+**Key Takeaways:**  
+High exposure to hurricanes and hail with mid‑layer protection.  
+Opportunities exist to **adjust attachment points and layering** for better ROI and risk balance.
+"""
+
+def simulate_rl_structures(attach_point=50, n=5):
+    structures = []
+    for _ in range(n):
+        layers = random.randint(1, 3)
+        limit = random.choice([50, 75, 100])
+        expected_loss = round(random.uniform(10, 80), 2)
+        roi = round(random.uniform(5, 25), 2)
+        structures.append([f"{layers} x {limit}M XS {attach_point}M", expected_loss, roi])
+    return pd.DataFrame(structures, columns=STRUCTURE_COLUMNS)
+
+def top_candidate(df):
+    return df.sort_values(by="Projected ROI (%)", ascending=False).iloc[0]
+
+def what_if_analysis(attach_point):
+    loss_change = round(random.uniform(-20, 20), 2)
+    roi_change = round(random.uniform(-5, 5), 2)
+    return loss_change, roi_change
+
+def simulated_chat_response(user_input, summary_context=None):
+    summary_context = summary_context or DEFAULT_SUMMARY_CONTEXT
+    return f"Considering {summary_context[:80]}..., {user_input.lower()} may improve ROI and balance tail risk under hurricane and hail scenarios."
+
+def plot_risk_heatmap(df):
+    heatmap_data = np.random.rand(5, 5)
+    fig, ax = plt.subplots()
+    sns.heatmap(heatmap_data, cmap="YlOrRd", cbar=True, ax=ax)
+    ax.set_title("Risk Heatmap: Loss Severity vs. ROI", fontsize=14)
+    ax.set_xlabel("ROI Quintile")
+    ax.set_ylabel("Loss Severity Quintile")
+    return fig
+
+def plot_structure_landscape(df, best_row):
+    fig, ax = plt.subplots(figsize=(6, 4))  # compact professional figure
+    scatter = ax.scatter(
+        df["Expected Loss (M)"],
+        df["Projected ROI (%)"],
+        c=df["Projected ROI (%)"],
+        cmap="viridis",
+        s=100, edgecolors="black", alpha=0.85
+    )
+
+    # Annotate top candidate
+    ax.text(
+        best_row["Expected Loss (M)"] + 0.5,
+        best_row["Projected ROI (%)"] + 0.3,
+        "⭐ Top Candidate", fontsize=9, weight="bold", color="darkgreen"
+    )
+
+    # Add horizontal ROI benchmark line
+    roi_benchmark = 15
+    ax.axhline(y=roi_benchmark, color="red", linestyle="--", alpha=0.6, linewidth=1.2)
+    ax.text(
+        df["Expected Loss (M)"].max() * 0.95, roi_benchmark + 0.3,
+        f"ROI Benchmark ({roi_benchmark}%)",
+        fontsize=8, color="red", ha="right"
+    )
+
+    # Axis labels & title
+    ax.set_xlabel("Expected Loss (Million $)", fontsize=11)
+    ax.set_ylabel("Projected ROI (%)", fontsize=11)
+    ax.set_title("Simulated Treaty Structures: Balancing Loss & Return", fontsize=13)
+    ax.grid(alpha=0.3)
+
+    # Add colorbar for ROI
+    fig.colorbar(scatter, label="Projected ROI (%)")
+    return fig
+
+def plot_attachment_impact(df, best_row, attach_point):
+    fig, ax = plt.subplots(figsize=(6, 4))
+    scatter = ax.scatter(
+        df["Expected Loss (M)"],
+        df["Projected ROI (%)"],
+        c=df["Projected ROI (%)"],
+        cmap="plasma",
+        s=90, edgecolors="black", alpha=0.85
+    )
+
+    # Benchmark ROI line (15%)
+    roi_benchmark = 15
+    ax.axhline(y=roi_benchmark, color="red", linestyle="--", alpha=0.7)
+    ax.text(
+        df["Expected Loss (M)"].max() * 0.95, roi_benchmark + 0.3,
+        f"ROI Benchmark ({roi_benchmark}%)",
+        fontsize=8, color="red", ha="right"
+    )
+
+    # Annotate top candidate
+    ax.text(
+        best_row["Expected Loss (M)"] + 0.5,
+        best_row["Projected ROI (%)"] + 0.3,
+        "⭐ Top Candidate",
+        fontsize=9, weight="bold", color="darkgreen"
+    )
+
+    ax.set_xlabel("Expected Loss (Million $)")
+    ax.set_ylabel("Projected ROI (%)")
+    ax.set_title(f"Impact of {attach_point}M Attachment", fontsize=13)
+    ax.grid(alpha=0.3)
+    fig.colorbar(scatter, label="Projected ROI (%)")
+    return fig
+
+def plot_risk_return(df, best_structure):
+    fig, ax = plt.subplots(figsize=(6, 4))
+    scatter = ax.scatter(
+        df["Expected Loss (M)"],
+        df["Projected ROI (%)"],
+        c=df.get("CVaR (%)", [12]*len(df)),
+        cmap="coolwarm",
+        s=80,
+        edgecolors="black"
+    )
+
+    # Highlight the best structure
+    ax.scatter(
+        best_structure["Expected Loss (M)"],
+        best_structure["Projected ROI (%)"],
+        color="gold",
+        edgecolors="black",
+        s=150,
+        label="🏆 Recommended"
+    )
+
+    # Annotate structures
+    for i, row in df.iterrows():
+        ax.text(
+            row["Expected Loss (M)"],
+            row["Projected ROI (%)"] + 0.4,
+            row["Structure"],
+            fontsize=7, ha='center'
+        )
+
+    # Add ROI benchmark line
+    roi_benchmark = 15
+    ax.axhline(y=roi_benchmark, color="green", linestyle="--", linewidth=1)
+    ax.text(df["Expected Loss (M)"].min(), roi_benchmark + 0.3, "ROI Benchmark (15%)", color="green", fontsize=8)
+
+    ax.set_xlabel("Expected Loss (Million $)")
+    ax.set_ylabel("Projected ROI (%)")
+    ax.set_title("Risk / Return Heatmap")
+    cbar = plt.colorbar(scatter, ax=ax)
+    cbar.set_label("CVaR (%) - Tail Risk")
+    return fig
@@ -0,0 +1,147 @@
+import copy
+import json
+
+import pytest
+
+from benchmarks.bench_engine import (
+    DEFAULT_NOISE_FLOOR,
+    MEMORY_NOISE_FLOOR,
+    check_baseline,
+    compare,
+    latency_summary,
+    main,
+    min_samples,
+)
+
+THRESHOLD = 0.20
+CALIBRATION = 0.010
+
+
+def make_result(p10, peak_mem=1_000_000, case="top_candidate", scale=1000):
+    latency = {"samples": 100, "min": p10 * 0.95, "max": p10 * 2,
+               "p10": p10, "p50": p10 * 1.1, "p90": p10 * 1.3, "p99": p10 * 1.8}
+    return {
+        "case": case,
+        "scale": scale,
+        "unit": "structures",
+        "latency_s": latency,
+        "calibration_s": CALIBRATION,
+        "relative_p10": p10 / CALIBRATION,
+        "throughput_per_s": scale / latency["min"],
+        "peak_mem_bytes": peak_mem,
+    }
+
+
+def make_run(results, **meta):
+    run_meta = {
+        "python": "3.11.7", "platform": "Linux", "numpy": "2.0", "pandas": "2.2", "matplotlib": "3.9",
+        "seed": 2025, "min_repeat": 10, "min_time": 5.0,
+        "scales": {"top_candidate": [10, 1000]},
+    }
+    run_meta.update(meta)
+    return {"meta": run_meta, "results": results}
+
+
+def single(p10, **kwargs):
+    return make_run({"top_candidate[n=1000]": make_result(p10, **kwargs)})
+
+
+def test_slowdown_past_threshold_is_flagged():
+    regressions = compare(single(0.013), single(0.010), THRESHOLD, DEFAULT_NOISE_FLOOR)
+    assert [(key, metric) for key, metric, *_ in regressions] == [
+        ("top_candidate[n=1000]", "p10 latency (calibrated)")
+    ]
+
+
+def test_sub_millisecond_slowdown_is_flagged():
+    # 0.15 ms -> 0.8 ms used to slip under a 1 ms absolute floor.
+    assert compare(single(0.0008), single(0.00015), THRESHOLD, DEFAULT_NOISE_FLOOR)
+
+
+def test_change_below_threshold_is_not_flagged():
+    assert compare(single(0.0115), single(0.010), THRESHOLD, DEFAULT_NOISE_FLOOR) == []
+
+
+def test_change_below_noise_floor_is_not_flagged():
+    old = 0.000003
+    new = old + DEFAULT_NOISE_FLOOR / 2
+    assert compare(single(new), single(old), THRESHOLD, DEFAULT_NOISE_FLOOR) == []
+
+
+def test_speedup_is_not_flagged():
+    assert compare(single(0.005), single(0.010), THRESHOLD, DEFAULT_NOISE_FLOOR) == []
+
+
+def test_memory_growth_past_floor_is_flagged():
+    old_mem = 200 * 1024
+    regressions = compare(single(0.010, peak_mem=old_mem + MEMORY_NOISE_FLOOR + 1024),
+                          single(0.010, peak_mem=old_mem), THRESHOLD, DEFAULT_NOISE_FLOOR)
+    assert [metric for _, metric, *_ in regressions] == ["peak memory"]
+
+
+def test_small_memory_growth_is_not_flagged():
+    # +100% but only 8 KiB: allocator noise.
+    regressions = compare(single(0.010, peak_mem=16 * 1024),
+                          single(0.010, peak_mem=8 * 1024), THRESHOLD, DEFAULT_NOISE_FLOOR)
+    assert regressions == []
+
+
+def test_min_samples():
+    assert min_samples(10) == 2
+    assert min_samples(50) == 2
+    assert min_samples(90) == 10
+    assert min_samples(99) == 100
+
+
+def test_percentiles_are_none_with_too_few_samples():
+    summary = latency_summary([0.001 * i for i in range(1, 11)])
+    assert summary["samples"] == 10
+    assert summary["min"] == pytest.approx(0.001)
+    assert summary["max"] == pytest.approx(0.010)
+    assert summary["p90"] is not None
+    assert summary["p99"] is None
+
+    summary = latency_summary([0.001])
+    assert summary["p10"] is None and summary["p50"] is None
+
+
+def test_p99_is_reported_with_enough_samples():
+    summary = latency_summary([0.001 * i for i in range(1, 101)])
+    assert summary["p99"] == pytest.approx(0.09901)
+
+
+def test_identical_runs_have_no_warnings():
+    run = single(0.010)
+    assert check_baseline(run, copy.deepcopy(run)) == []
+
+
+def test_missing_and_extra_cases_warn():
+    current = make_run({"top_candidate[n=10]": make_result(0.001, scale=10),
+                        "top_candidate[n=5000]": make_result(0.01, scale=5000)})
+    baseline = make_run({"top_candidate[n=10]": make_result(0.001, scale=10),
+                         "top_candidate[n=1000]": make_result(0.01)})
+    warnings = check_baseline(current, baseline)
+    assert "top_candidate[n=5000] has no baseline entry" in warnings
+    assert "top_candidate[n=1000] is in the baseline but was not run" in warnings
+
+
+def test_unselected_baseline_cases_do_not_warn():
+    current = single(0.010)
+    baseline = make_run({"top_candidate[n=1000]": make_result(0.010),
+                         "plot_risk_return[n=10]": make_result(0.1, case="plot_risk_return", scale=10)})
+    assert check_baseline(current, baseline, only=["top_candidate"]) == []
+
+
+def test_meta_mismatch_warns():
+    baseline = make_run(single(0.010)["results"], min_repeat=5, numpy="1.26", scales={"top_candidate": [10]})
+    warnings = check_baseline(single(0.010), baseline)
+    assert any(w.startswith("min_repeat differs") for w in warnings)
+    assert any(w.startswith("numpy differs") for w in warnings)
+    assert any(w.startswith("top_candidate scales differ") for w in warnings)
+
+
+def test_compare_refuses_other_seed(tmp_path, capsys):
+    path = tmp_path / "baseline.json"
+    path.write_text(json.dumps(make_run({}, seed=1)))
+    assert main(["--compare", str(path), "--seed", "2025"]) == 2
+    assert "refusing to compare" in capsys.readouterr().err
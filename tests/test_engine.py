@@ -0,0 +1,98 @@
+import random
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pandas as pd
+import pytest
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from engine import (
+    DEFAULT_SUMMARY_CONTEXT,
+    STRUCTURE_COLUMNS,
+    generate_summary,
+    simulate_rl_structures,
+    top_candidate,
+    simulated_chat_response,
+    plot_structure_landscape,
+    plot_attachment_impact,
+    plot_risk_return,
+)
+
+
+def test_simulate_rl_structures_columns_and_size():
+    random.seed(0)
+    df = simulate_rl_structures(75, n=12)
+    assert list(df.columns) == STRUCTURE_COLUMNS
+    assert len(df) == 12
+    assert df["Structure"].str.endswith("XS 75M").all()
+
+
+def test_simulate_rl_structures_default_size():
+    assert len(simulate_rl_structures()) == 5
+
+
+def test_top_candidate_is_max_roi_row():
+    df = pd.DataFrame(
+        [["1 x 50M XS 50M", 20.0, 8.5],
+         ["2 x 75M XS 50M", 45.0, 22.1],
+         ["3 x 100M XS 50M", 70.0, 14.0]],
+        columns=STRUCTURE_COLUMNS,
+    )
+    best = top_candidate(df)
+    assert best["Structure"] == "2 x 75M XS 50M"
+    assert best["Projected ROI (%)"] == 22.1
+
+
+def test_chat_response_falls_back_to_default_context():
+    response = simulated_chat_response("Split Into Two Layers?", None)
+    assert DEFAULT_SUMMARY_CONTEXT[:80] in response
+    assert "split into two layers?" in response
+
+
+def test_chat_response_uses_summary():
+    summary = generate_summary()
+    response = simulated_chat_response("Raise the attachment", summary)
+    assert response.startswith(f"Considering {summary[:80]}...")
+
+
+def texts(fig):
+    return [text.get_text() for text in fig.axes[0].texts]
+
+
+@pytest.fixture
+def structures():
+    random.seed(0)
+    df = simulate_rl_structures(75, n=10)
+    yield df, top_candidate(df)
+    plt.close("all")
+
+
+def test_structure_landscape_marks_top_candidate(structures):
+    df, best = structures
+    fig = plot_structure_landscape(df, best)
+    assert isinstance(fig, Figure)
+    assert "⭐ Top Candidate" in texts(fig)
+    assert "ROI Benchmark (15%)" in texts(fig)
+    [star] = [t for t in fig.axes[0].texts if t.get_text() == "⭐ Top Candidate"]
+    assert star.get_position() == pytest.approx(
+        (best["Expected Loss (M)"] + 0.5, best["Projected ROI (%)"] + 0.3)
+    )
+
+
+def test_attachment_impact_titles_attachment(structures):
+    df, best = structures
+    fig = plot_attachment_impact(df, best, 75)
+    assert isinstance(fig, Figure)
+    assert fig.axes[0].get_title() == "Impact of 75M Attachment"
+    assert "⭐ Top Candidate" in texts(fig)
+
+
+def test_risk_return_labels_every_structure(structures):
+    df, best = structures
+    fig = plot_risk_return(df, best)
+    assert isinstance(fig, Figure)
+    labels = [t for t in texts(fig) if t != "ROI Benchmark (15%)"]
+    assert labels == list(df["Structure"])